@@ -1,35 +1,67 @@
+import heapq
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from itertools import product
-from typing import List, Set, Tuple, Optional, Dict
+from typing import List, Set, Tuple, Optional, Dict, NamedTuple
 from dataclasses import dataclass
 from collections import defaultdict
 
+# Below this expression size, process spawn overhead outweighs the win
+# from searching splits in parallel.
+PARALLEL_SPLIT_THRESHOLD = 6
+
+# Raw candidate-count estimate above which direct_search_exact splits its
+# root numbers across worker processes.
+DIRECT_PARALLEL_THRESHOLD = 2_000_000
+
+# Splits an expression without parentheses into alternating terms and
+# top-level +/- signs in one C-level pass.
+TOPLEVEL_SPLIT = re.compile(r'([+-])')
+
+# Tokeniser for the general (parenthesised) case: numbers, operators and
+# parens come out as whole tokens, so the scans below branch per token
+# instead of per character. '**' must precede '*' in the alternation.
+TOKENISE = re.compile(r'\d+|\*\*|[+\-*/()]')
+
+# Padded operator strings, built once instead of per formatted pair.
+OP_SEPARATORS = {op: f" {op} " for op in ('+', '-', '*', '/', '**')}
+
+
+@lru_cache(maxsize=100000)
 def canonical_key(expression: str) -> str:
     """Create a canonical form of an expression for deduplication."""
     expr = expression.replace(" ", "")
     terms = []
-    current = ""
-    depth = 0
-    sign = "+"
 
-    i = 0
-    while i < len(expr):
-        c = expr[i]
-        if c == '(':
-            depth += 1
-            current += c
-        elif c == ')':
-            depth -= 1
-            current += c
-        elif c in ('+', '-') and depth == 0 and current:
-            terms.append((sign, normalise_mult_term(current)))
-            sign = c
-            current = ""
-        else:
-            current += c
-        i += 1
+    if expr and '(' not in expr and expr[0] not in '+-':
+        # Common case: no parentheses, so every +/- is a top-level operator.
+        parts = TOPLEVEL_SPLIT.split(expr)
+        terms.append(('+', normalise_mult_term(parts[0])))
+        for i in range(1, len(parts) - 1, 2):
+            terms.append((parts[i], normalise_mult_term(parts[i + 1])))
+    else:
+        current: List[str] = []
+        depth = 0
+        sign = "+"
+
+        for tok in TOKENISE.findall(expr):
+            if tok == '(':
+                depth += 1
+                current.append(tok)
+            elif tok == ')':
+                depth -= 1
+                current.append(tok)
+            elif tok in ('+', '-') and depth == 0 and current:
+                terms.append((sign, normalise_mult_term(''.join(current))))
+                sign = tok
+                current = []
+            else:
+                current.append(tok)
 
-    if current:
-        terms.append((sign, normalise_mult_term(current)))
+        if current:
+            terms.append((sign, normalise_mult_term(''.join(current))))
 
     pos_terms = sorted([t[1] for t in terms if t[0] == '+'])
     neg_terms = sorted([t[1] for t in terms if t[0] == '-'])
@@ -40,44 +72,76 @@ def canonical_key(expression: str) -> str:
     for t in neg_terms:
         result_parts.append('-' + t)
 
-    return ''.join(result_parts)
+    # Intern so distinct spellings of the same expression share one string
+    # object and Solution equality short-circuits on identity.
+    return sys.intern(''.join(result_parts))
 
 
+@lru_cache(maxsize=100000)
 def normalise_mult_term(term: str) -> str:
     """Normalise a multiplication/division term by sorting factors."""
-    while term.startswith('(') and term.endswith(')'):
+    toks = TOKENISE.findall(term)
+
+    # Strip parentheses that wrap the whole term.
+    while len(toks) >= 2 and toks[0] == '(' and toks[-1] == ')':
         depth = 0
         matches = True
-        for i, c in enumerate(term):
-            if c == '(':
+        for i, tok in enumerate(toks):
+            if tok == '(':
                 depth += 1
-            elif c == ')':
+            elif tok == ')':
                 depth -= 1
-            if depth == 0 and i < len(term) - 1:
+            if depth == 0 and i < len(toks) - 1:
                 matches = False
                 break
         if matches:
-            term = term[1:-1]
+            toks = toks[1:-1]
         else:
             break
 
-    if '/' not in term and '*' in term:
-        factors = term.split('*')
+    if '/' not in toks and '**' not in toks and '*' in toks:
+        # Sort the top-level factors of a pure product; splitting on
+        # tokens at depth 0 keeps parenthesised factors intact.
+        factors: List[str] = []
+        current: List[str] = []
+        depth = 0
+        for tok in toks:
+            if tok == '(':
+                depth += 1
+            elif tok == ')':
+                depth -= 1
+            if tok == '*' and depth == 0:
+                factors.append(''.join(current))
+                current = []
+            else:
+                current.append(tok)
+        factors.append(''.join(current))
         return '*'.join(sorted(factors))
 
-    return term
+    return ''.join(toks)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Solution:
+    # Slotted and frozen: millions of instances pass through the dedup
+    # sets, and slots cut the per-instance footprint to a fraction of a
+    # dict-backed object.
     expression: str
     result: int
     unique_nums: Tuple[int, ...]
     op_count: int
     _canonical: str = ""
+    _hash: int = 0
 
     def __post_init__(self):
-        object.__setattr__(self, '_canonical', canonical_key(self.expression))
+        # Single numbers are already canonical; skip the parse for them.
+        if self.expression.lstrip('-').isdigit():
+            object.__setattr__(self, '_canonical', sys.intern('+' + self.expression))
+        else:
+            object.__setattr__(self, '_canonical', canonical_key(self.expression))
+        # Solutions live in sets and get rehashed on every dedup probe;
+        # canonical keys are interned, so cache the hash up front too.
+        object.__setattr__(self, '_hash', hash(self._canonical))
 
     def __lt__(self, other):
         if self.op_count != other.op_count:
@@ -85,99 +149,238 @@ class Solution:
         return len(self.unique_nums) < len(other.unique_nums)
 
     def __eq__(self, other):
-        return self._canonical == other._canonical
+        return self._canonical is other._canonical or self._canonical == other._canonical
 
     def __hash__(self):
-        return hash(self._canonical)
-
-
-@dataclass(frozen=True)
-class PartialResult:
+        return self._hash
+
+    def __reduce__(self):
+        # hash(str) is seeded per process, and _canonical relies on
+        # interning for the fast __eq__ path; rebuild both on unpickle so
+        # Solutions returned by worker processes (under spawn as well as
+        # fork) dedup correctly in the parent's sets.
+        return (Solution,
+                (self.expression, self.result, self.unique_nums, self.op_count))
+
+
+class PartialResult(NamedTuple):
+    # A NamedTuple rather than a dataclass: millions of these are created
+    # during meet-in-the-middle, and tuples are roughly half the size.
+    # recipe is a nested tuple (see render_recipe), not a string:
+    # combining two partials is one tuple allocation regardless of how
+    # long their expressions would print, and the text is only rendered
+    # for the few partials that become Solutions.
+    # nums_used is a bitmask (bit n set when number n appears): merging
+    # two sides' numbers is a single int | instead of a tuple merge, and
+    # the distinct count is one bit_count() call.
     value: int
-    expression: str
-    nums_used: Tuple[int, ...]
+    recipe: Tuple
+    nums_used: int
     op_count: int
 
 
+def nums_mask(nums: Tuple[int, ...]) -> int:
+    """Fold a number tuple into its usage bitmask."""
+    mask = 0
+    for n in nums:
+        mask |= 1 << n
+    return mask
+
+
+@lru_cache(maxsize=100000)
+def mask_to_nums(mask: int) -> Tuple[int, ...]:
+    """Expand a usage bitmask back into a sorted tuple of numbers.
+
+    Only run for partials that become Solutions; the cache hash-conses
+    the tuples so repeated masks share one object.
+    """
+    out = []
+    while mask:
+        bit = mask & -mask
+        out.append(bit.bit_length() - 1)
+        mask ^= bit
+    return tuple(out)
+
+
+@lru_cache(maxsize=100000)
+def render_recipe(recipe: Tuple) -> str:
+    """Turn a stored recipe back into an expression string.
+
+    Recipes are built during search instead of strings because almost all
+    partials are discarded; the string is only materialised for confirmed
+    solutions. Forms: ('num', n), ('flat', nums, ops) for directly
+    enumerated expressions, or (op, left_recipe, right_recipe). Memoised
+    because one partial's recipe appears in many candidate pairings, and
+    the recursion renders each shared subtree once instead of per pair.
+    """
+    kind = recipe[0]
+    if kind == 'num':
+        return str(recipe[1])
+    if kind == 'flat':
+        return format_expression(list(recipe[1]), list(recipe[2]))
+
+    op, left, right = recipe
+    left_expr = render_recipe(left)
+    right_expr = render_recipe(right)
+    if op in ('*', '/'):
+        left_expr = wrap_if_needed(left_expr, for_mult_div=True)
+        if op == '/':
+            right_expr = wrap_for_division(right_expr)
+        else:
+            right_expr = wrap_if_needed(right_expr, for_mult_div=True)
+    elif op == '-':
+        right_expr = wrap_for_subtraction(right_expr)
+    return f"{left_expr} {op} {right_expr}"
+
+
+# Integer opcodes for the hot evaluation path: comparing small ints is
+# cheaper than comparing operator strings millions of times.
+OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_POW = 0, 1, 2, 3, 4
+OP_CODES = {'+': OP_ADD, '-': OP_SUB, '*': OP_MUL, '/': OP_DIV, '**': OP_POW}
+
+# Bit flags for the enabled-operator set, distinct from the opcodes above:
+# a single int mask gives O(1) membership tests without string comparisons.
+BIT_ADD, BIT_MUL, BIT_SUB, BIT_DIV, BIT_POW = 1, 2, 4, 8, 16
+OP_BITS = {'+': BIT_ADD, '*': BIT_MUL, '-': BIT_SUB, '/': BIT_DIV, '**': BIT_POW}
+
+
+def operator_mask(operators: Tuple[str, ...]) -> int:
+    """Fold an operator collection into its OP_BITS bitmask."""
+    mask = 0
+    for op in operators:
+        mask |= OP_BITS[op]
+    return mask
+
+
 def evaluate_expression(numbers: List[int], operators: List[str]) -> Optional[int]:
-    """Evaluate an expression respecting operator precedence."""
+    """Evaluate an expression respecting operator precedence.
+
+    One sweep with running accumulators instead of three passes of O(n)
+    list pops.
+    """
     if not numbers:
         return 0
     if len(numbers) == 1:
         return numbers[0]
 
-    nums = list(numbers)
-    ops = list(operators)
-
-    i = 0
-    while i < len(ops):
-        if ops[i] in ('**',):
-            nums[i] = nums[i] ** nums[i + 1]
-            nums.pop(i + 1)
-            ops.pop(i)
-        else:
-            i += 1
-
-    i = 0
-    while i < len(ops):
-        if ops[i] in ('*', '/'):
-            if ops[i] == '*':
-                nums[i] = nums[i] * nums[i + 1]
+    if '**' not in operators:
+        # Common case: no exponent runs to collapse, so sweep the inputs
+        # directly without building intermediate lists.
+        vals, flat_ops = numbers, operators
+    else:
+        # Collapse exponent runs first.
+        vals = []
+        flat_ops = []
+        cur = numbers[0]
+        for i, op in enumerate(operators):
+            nxt = numbers[i + 1]
+            if op == '**':
+                cur = cur ** nxt
             else:
-                if nums[i + 1] == 0 or nums[i] % nums[i + 1] != 0:
-                    return None
-                nums[i] = nums[i] // nums[i + 1]
-            nums.pop(i + 1)
-            ops.pop(i)
+                vals.append(cur)
+                flat_ops.append(op)
+                cur = nxt
+        vals.append(cur)
+
+    # Single sweep: accumulate the running */ chain, flush it on +/-.
+    total = 0
+    chain = vals[0]
+    pending = '+'
+    for i, op in enumerate(flat_ops):
+        nxt = vals[i + 1]
+        if op == '*':
+            chain = chain * nxt
+        elif op == '/':
+            if nxt == 0 or chain % nxt != 0:
+                return None
+            chain = chain // nxt
         else:
-            i += 1
-
-    result = nums[0]
-    for i, op in enumerate(ops):
-        if op == '+':
-            result += nums[i + 1]
-        else:
-            result -= nums[i + 1]
-
-    return result
+            total = total + chain if pending == '+' else total - chain
+            pending = op
+            chain = nxt
+    total = total + chain if pending == '+' else total - chain
+    return total
 
 
 def format_expression(numbers: List[int], operators: List[str]) -> str:
-    """Format numbers and operators into a readable expression string."""
+    """Format numbers and operators into a readable expression string.
+
+    Exponentiation binds tighter than * and /, which bind tighter than
+    + and -; the evaluator also folds ** runs left-to-right, so a run is
+    rendered as (a ** b) ** c to keep the string's standard reading (with
+    right-associative **) equal to the evaluated value.
+    """
     if not numbers:
         return ""
     if len(numbers) == 1:
         return str(numbers[0])
 
-    segments: List[str] = []
-    current_group: List[str] = [str(numbers[0])]
-    in_mult_group = False
+    # (sign, rendered term, term is a * / group needing parentheses)
+    terms: List[Tuple[str, str, bool]] = []
+    sign = '+'
+    parts: List[str] = []
+    factor = str(numbers[0])
+    factor_pow = False
 
     for i, op in enumerate(operators):
-        if op in ('*', '/'):
-            if not in_mult_group:
-                in_mult_group = True
-            current_group.append(f" {op} {numbers[i + 1]}")
+        nxt = str(numbers[i + 1])
+        if op == '**':
+            factor = (f"({factor}) ** {nxt}" if factor_pow
+                      else f"{factor} ** {nxt}")
+            factor_pow = True
+        elif op == '*' or op == '/':
+            parts.append(factor)
+            parts.append(OP_SEPARATORS[op])
+            factor = nxt
+            factor_pow = False
         else:
-            if in_mult_group:
-                segments.append("(" + "".join(current_group) + ")")
-                in_mult_group = False
-            else:
-                segments.append("".join(current_group))
-            segments.append(f" {op} ")
-            current_group = [str(numbers[i + 1])]
-
-    if in_mult_group:
-        segments.append("(" + "".join(current_group) + ")")
-    else:
-        segments.append("".join(current_group))
+            parts.append(factor)
+            terms.append((sign, ''.join(parts), len(parts) > 1))
+            sign = op
+            parts = []
+            factor = nxt
+            factor_pow = False
+    parts.append(factor)
+    terms.append((sign, ''.join(parts), len(parts) > 1))
 
-    return "".join(segments)
+    segments: List[str] = []
+    for sign, text, is_group in terms:
+        if is_group:
+            text = f"({text})"
+        if segments:
+            segments.append(OP_SEPARATORS[sign])
+        segments.append(text)
+    return ''.join(segments)
+
+
+def is_fully_wrapped(expr: str) -> bool:
+    """True if expr is entirely enclosed by a single pair of parentheses.
+
+    "(2 + 3)" is wrapped; "(1 * 1) - (7 * 7)" merely starts and ends with
+    parentheses and still needs wrapping when embedded.
+    """
+    if not (expr.startswith('(') and expr.endswith(')')):
+        return False
+    depth = 0
+    last = len(expr) - 1
+    for i, c in enumerate(expr):
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+            if depth == 0 and i < last:
+                return False
+    return True
 
 
+@lru_cache(maxsize=100000)
 def wrap_if_needed(expr: str, for_mult_div: bool = False) -> str:
-    """Wrap expression in parentheses if needed for operator precedence."""
-    if expr.startswith('(') and expr.endswith(')'):
+    """Wrap expression in parentheses if needed for operator precedence.
+
+    Cached: the same sub-expression strings recur across the many
+    candidates that share them, and the answer only depends on the text.
+    """
+    if is_fully_wrapped(expr):
         return expr
     if ' ' not in expr:
         return expr
@@ -187,9 +390,24 @@ def wrap_if_needed(expr: str, for_mult_div: bool = False) -> str:
     return expr
 
 
+@lru_cache(maxsize=100000)
+def wrap_for_division(expr: str) -> str:
+    """Wrap any compound expression (for right side of division).
+
+    Unlike multiplication, dropping parentheses on the right of a division
+    changes the value even for * and /: a / (b * c) != a / b * c.
+    """
+    if is_fully_wrapped(expr):
+        return expr
+    if ' ' in expr:
+        return f"({expr})"
+    return expr
+
+
+@lru_cache(maxsize=100000)
 def wrap_for_subtraction(expr: str) -> str:
     """Wrap expression in parentheses if it contains + or - (for right side of subtraction)."""
-    if expr.startswith('(') and expr.endswith(')'):
+    if is_fully_wrapped(expr):
         return expr
     if '+' in expr or '-' in expr:
         # Check if it's just a negative number like "-5" which doesn't need parens
@@ -200,93 +418,326 @@ def wrap_for_subtraction(expr: str) -> str:
     return expr
 
 
-def generate_all_subexpressions(
+def compile_pattern(ops: Tuple[str, ...]):
+    """Build a specialised evaluator for one operator pattern.
+
+    A division-free pattern becomes one straight-line arithmetic lambda
+    with no operator dispatch per call. Patterns containing '/' get a
+    generated function instead, with the zero and exactness checks
+    unrolled inline so an invalid division bails out with None the same
+    way evaluate_expression does. ** runs are parenthesised because the
+    evaluator folds them left to right.
+    """
+    # Fold ** runs into per-term expressions first.
+    vals: List[str] = []
+    flat_ops: List[str] = []
+    factor = "n[0]"
+    factor_pow = False
+    for i, op in enumerate(ops):
+        nxt = f"n[{i + 1}]"
+        if op == '**':
+            factor = (f"({factor}) ** {nxt}" if factor_pow
+                      else f"{factor} ** {nxt}")
+            factor_pow = True
+        else:
+            vals.append(factor)
+            flat_ops.append(op)
+            factor = nxt
+            factor_pow = False
+    vals.append(factor)
+
+    if '/' not in flat_ops:
+        expr = vals[0]
+        for op, val in zip(flat_ops, vals[1:]):
+            expr = f"{expr} {op} {val}"
+        return eval(compile(f"lambda n: {expr}", '<pattern>', 'eval'))
+
+    # Division breaks the single-expression form: each '/' needs a
+    # divisor-is-zero check and an exactness check before committing.
+    lines = ["def _pattern(n):"]
+    exprs: List[str] = []
+    signs: List[str] = []
+    pending = '+'
+    chain = vals[0]
+    tmp = 0
+    for op, val in zip(flat_ops, vals[1:]):
+        if op == '*':
+            chain = f"{chain} * {val}"
+        elif op == '/':
+            lines.append(f"    d{tmp} = {val}")
+            lines.append(f"    if d{tmp} == 0:")
+            lines.append("        return None")
+            lines.append(f"    q{tmp}, r = divmod({chain}, d{tmp})")
+            lines.append("    if r:")
+            lines.append("        return None")
+            chain = f"q{tmp}"
+            tmp += 1
+        else:
+            exprs.append(chain)
+            signs.append(pending)
+            pending = op
+            chain = val
+    exprs.append(chain)
+    signs.append(pending)
+    ret = exprs[0]
+    for sign, expr in zip(signs[1:], exprs[1:]):
+        ret = f"{ret} {sign} {expr}"
+    lines.append(f"    return {ret}")
+    namespace: Dict[str, object] = {}
+    exec(compile('\n'.join(lines), '<pattern>', 'exec'), namespace)
+    return namespace['_pattern']
+
+
+@lru_cache(maxsize=64)
+def compiled_op_patterns(
+        operators: Tuple[str, ...],
+        length: int
+) -> Tuple[List[Tuple], List[Tuple]]:
+    """Operator patterns of the given length, with compiled evaluators.
+
+    Each entry is (ops, compiled evaluator).
+    Returns (all patterns, the order-dependent subset); a pattern is
+    order-invariant when it repeats a single commutative operator.
+    Cached because every table level re-derives the same patterns; being
+    process-wide, the cache also spans Streamlit reruns and sessions, so
+    the app needs no cache layer of its own for these.
+    """
+    patterns = [(ops, compile_pattern(ops))
+                for ops in product(operators, repeat=length)]
+    order_dependent = [p for p in patterns
+                       if len(set(p[0])) > 1 or p[0][0] not in ('+', '*')]
+    return patterns, order_dependent
+
+
+class BoundedPartials:
+    """Fixed-capacity holder for the best partials of one table value.
+
+    Keeps the cap best PartialResults under Solution-style ordering
+    (fewest operations, then fewest distinct numbers) via a bounded heap,
+    rather than whichever happened to be generated first. A cap of 0
+    keeps everything in insertion order.
+    """
+    __slots__ = ('cap', 'entries', 'tick')
+
+    def __init__(self, cap: int):
+        self.cap = cap
+        self.entries: list = []
+        self.tick = 0
+
+    def add(self, partial: PartialResult) -> None:
+        if self.cap == 0:
+            self.entries.append(partial)
+            return
+        if (len(self.entries) == self.cap
+                and -partial.op_count < self.entries[0][0]):
+            # Strictly more operations than the worst retained entry:
+            # rejected without building the heap tuple.
+            return
+        # Decreasing tick makes later entries lose ties and keeps the
+        # heap from ever comparing PartialResults directly.
+        self.tick -= 1
+        entry = (-partial.op_count, -partial.nums_used.bit_count(), self.tick, partial)
+        if len(self.entries) < self.cap:
+            heapq.heappush(self.entries, entry)
+        elif entry > self.entries[0]:
+            heapq.heapreplace(self.entries, entry)
+
+    def partials(self) -> List[PartialResult]:
+        if self.cap == 0:
+            return self.entries
+        return [e[3] for e in sorted(self.entries, reverse=True)]
+
+
+def build_subexpression_level(
+        table: List[Dict[int, List[PartialResult]]],
+        k: int,
         available_numbers: List[int],
-        num_count: int,
         operators: List[str],
-        max_results_per_value: int = 3
+        max_results_per_value: int
 ) -> Dict[int, List[PartialResult]]:
-    """Generate all possible values from expressions using num_count numbers."""
-    results: Dict[int, List[PartialResult]] = defaultdict(list)
+    """Build the value -> partials map for expression size k from smaller levels."""
     unlimited = (max_results_per_value == 0)
-
-    if num_count == 0:
-        return results
-
-    if num_count == 1:
-        for n in available_numbers:
-            results[n].append(PartialResult(
-                value=n,
-                expression=str(n),
-                nums_used=(n,),
-                op_count=0
-            ))
-        return results
-
-    if num_count <= 3:
-        for nums in product(available_numbers, repeat=num_count):
-            for ops in product(operators, repeat=num_count - 1):
-                value = evaluate_expression(list(nums), list(ops))
-                if value is not None:
-                    if unlimited or len(results[value]) < max_results_per_value:
-                        expr = format_expression(list(nums), list(ops))
-                        unique = tuple(sorted(set(nums)))
-                        results[value].append(PartialResult(
+    op_mask = operator_mask(tuple(operators))
+    results: Dict[int, BoundedPartials] = defaultdict(
+        lambda: BoundedPartials(max_results_per_value))
+
+    if k <= 3:
+        # One pass per operator pattern over a precomputed batch of number
+        # tuples, rather than re-dispatching every pattern per tuple: the
+        # compiled evaluator and the pattern's fields stay in locals for
+        # the whole sweep, and each tuple's unique-number set is derived
+        # once up front. A pure-+ or pure-* pattern gives the same value
+        # for every ordering of the numbers, so those sweep only the
+        # sorted representatives.
+        op_patterns, order_dependent = compiled_op_patterns(tuple(operators), k - 1)
+        order_invariant = [p for p in op_patterns if p not in order_dependent]
+        all_pairs = [(nums, nums_mask(nums))
+                     for nums in product(available_numbers, repeat=k)]
+        sorted_pairs = [(nums, unique) for nums, unique in all_pairs
+                        if all(nums[i] <= nums[i + 1] for i in range(k - 1))]
+        for patterns, pairs in ((order_dependent, all_pairs),
+                                (order_invariant, sorted_pairs)):
+            for ops, fast in patterns:
+                for nums, unique in pairs:
+                    value = fast(nums)
+                    if value is not None:
+                        results[value].add(PartialResult(
                             value=value,
-                            expression=expr,
+                            recipe=('flat', nums, ops),
                             nums_used=unique,
-                            op_count=num_count - 1
+                            op_count=k - 1
                         ))
     else:
-        left_count = num_count // 2
-        right_count = num_count - left_count
-
-        left_vals = generate_all_subexpressions(available_numbers, left_count, operators, max_results_per_value)
-        right_vals = generate_all_subexpressions(available_numbers, right_count, operators, max_results_per_value)
-
-        for left_val, left_partials in left_vals.items():
-            for right_val, right_partials in right_vals.items():
-                left_to_try = left_partials if unlimited else left_partials[:1]
+        left_count = k // 2
+        right_count = k - left_count
+
+        # Only combine with operators the caller enabled; blindly trying
+        # all four would leak disallowed operators into the recipes. The
+        # flags (and the right-side item list) are hoisted out of the
+        # O(|L| * |R|) scan so the pair loop is pure arithmetic.
+        use_add = bool(op_mask & BIT_ADD)
+        use_sub = bool(op_mask & BIT_SUB)
+        use_mul = bool(op_mask & BIT_MUL)
+        use_div = bool(op_mask & BIT_DIV)
+        right_items = list(table[right_count].items())
+
+        for left_val, left_partials in table[left_count].items():
+            left_to_try = left_partials if unlimited else left_partials[:1]
+
+            for right_val, right_partials in right_items:
                 right_to_try = right_partials if unlimited else right_partials[:1]
 
                 for lp in left_to_try:
                     for rp in right_to_try:
-                        combined_unique = tuple(sorted(set(lp.nums_used + rp.nums_used)))
+                        combined_unique = lp.nums_used | rp.nums_used
                         combined_ops = lp.op_count + rp.op_count + 1
 
-                        for op, val in [
-                            ('+', left_val + right_val),
-                            ('-', left_val - right_val),
-                            ('*', left_val * right_val),
-                        ]:
-                            if unlimited or len(results[val]) < max_results_per_value:
-                                if op == '*':
-                                    left_expr = wrap_if_needed(lp.expression, for_mult_div=True)
-                                    right_expr = wrap_if_needed(rp.expression, for_mult_div=True)
-                                    expr = f"{left_expr} * {right_expr}"
-                                else:
-                                    expr = f"{lp.expression} {op} {rp.expression}"
-                                results[val].append(PartialResult(
-                                    value=val,
-                                    expression=expr,
-                                    nums_used=combined_unique,
-                                    op_count=combined_ops
-                                ))
-
-                        if right_val != 0 and left_val % right_val == 0:
-                            val = left_val // right_val
-                            if unlimited or len(results[val]) < max_results_per_value:
-                                left_expr = wrap_if_needed(lp.expression, for_mult_div=True)
-                                right_expr = wrap_if_needed(rp.expression, for_mult_div=True)
-                                expr = f"{left_expr} / {right_expr}"
-                                results[val].append(PartialResult(
-                                    value=val,
-                                    expression=expr,
-                                    nums_used=combined_unique,
-                                    op_count=combined_ops
-                                ))
-
-    return results
+                        if use_add:
+                            results[left_val + right_val].add(PartialResult(
+                                value=left_val + right_val,
+                                recipe=('+', lp.recipe, rp.recipe),
+                                nums_used=combined_unique,
+                                op_count=combined_ops
+                            ))
+                        if use_sub:
+                            results[left_val - right_val].add(PartialResult(
+                                value=left_val - right_val,
+                                recipe=('-', lp.recipe, rp.recipe),
+                                nums_used=combined_unique,
+                                op_count=combined_ops
+                            ))
+                        if use_mul:
+                            results[left_val * right_val].add(PartialResult(
+                                value=left_val * right_val,
+                                recipe=('*', lp.recipe, rp.recipe),
+                                nums_used=combined_unique,
+                                op_count=combined_ops
+                            ))
+                        if (use_div
+                                and right_val != 0 and left_val % right_val == 0):
+                            results[left_val // right_val].add(PartialResult(
+                                value=left_val // right_val,
+                                recipe=('/', lp.recipe, rp.recipe),
+                                nums_used=combined_unique,
+                                op_count=combined_ops
+                            ))
+
+    return {val: bp.partials() for val, bp in results.items()}
+
+
+def build_subexpression_table(
+        available_numbers: List[int],
+        operators: List[str],
+        max_k: int,
+        max_results_per_value: int = 3
+) -> List[Dict[int, List[PartialResult]]]:
+    """Build value -> partials maps for every expression size 1..max_k.
+
+    Bottom-up dynamic programming: table[k] is computed once from smaller
+    entries, instead of re-deriving it recursively for every split. Each
+    value keeps its max_results_per_value best partials (see
+    BoundedPartials), so lists are sorted best-first and never overgrow.
+    """
+    table: List[Dict[int, List[PartialResult]]] = [defaultdict(list) for _ in range(2)]
+
+    if max_k >= 1:
+        for n in available_numbers:
+            table[1][n].append(PartialResult(
+                value=n,
+                recipe=('num', n),
+                nums_used=1 << n,
+                op_count=0
+            ))
+
+    for k in range(2, max_k + 1):
+        table.append(build_subexpression_level(
+            table, k, available_numbers, operators, max_results_per_value))
+
+    return table
+
+
+@lru_cache(maxsize=32)
+def cached_subexpression_table(
+        available_numbers: Tuple[int, ...],
+        operators: Tuple[str, ...],
+        max_k: int,
+        max_results_per_value: int = 3
+) -> List[Dict[int, List[PartialResult]]]:
+    """Memoised subexpression tables for repeated identical searches.
+
+    The tables depend only on the number pool and operator set, so callers
+    probing several targets (or re-running a search) reuse them for free.
+    Defined recursively on max_k: the table for max_k extends the cached
+    table for max_k - 1 by one level, so find_solutions' pass over
+    increasing sizes never rebuilds the levels it already has.
+    """
+    if max_k <= 1:
+        return build_subexpression_table(list(available_numbers), list(operators),
+                                         max_k, max_results_per_value)
+    table = cached_subexpression_table(available_numbers, operators,
+                                       max_k - 1, max_results_per_value)
+    return table + [build_subexpression_level(
+        table, max_k, list(available_numbers), list(operators),
+        max_results_per_value)]
+
+
+def generate_all_subexpressions(
+        available_numbers: List[int],
+        num_count: int,
+        operators: List[str],
+        max_results_per_value: int = 3
+) -> Dict[int, List[PartialResult]]:
+    """Generate all possible values from expressions using num_count numbers."""
+    if num_count == 0:
+        return defaultdict(list)
+    return cached_subexpression_table(tuple(available_numbers), tuple(operators),
+                                      num_count, max_results_per_value)[num_count]
+
+
+def prune_dominated(partials: List[PartialResult], best_only: bool = False) -> List[PartialResult]:
+    """Keep one representative per nums_used at the minimum op_count.
+
+    Any partial with more operations (or a duplicate number set) can never
+    beat the representative under Solution ordering, so pairing against it
+    is wasted work. With best_only, collapse further to the single partial
+    using the fewest distinct numbers.
+
+    Table lists arrive sorted best-first (fewest operations, then fewest
+    distinct numbers), so the best entry is the head and the scan stops
+    at the first one with more operations.
+    """
+    if best_only:
+        return [partials[0]]
+    best_op = partials[0].op_count
+    seen: Set[Tuple[int, ...]] = set()
+    kept = []
+    for p in partials:
+        if p.op_count != best_op:
+            break
+        if p.nums_used not in seen:
+            seen.add(p.nums_used)
+            kept.append(p)
+    return kept
 
 
 def meet_in_middle_search(
@@ -300,109 +751,388 @@ def meet_in_middle_search(
     """Use meet-in-the-middle to find expressions that equal target."""
     solutions: Set[Solution] = set()
     max_per_value = 0 if exhaustive else 3
+    # Every solution at this level has exactly total_nums - 1 operations, so
+    # once top_n distinct ones exist the rest of the level cannot rank better.
+    early_stop = 0 if exhaustive else top_n
 
     if total_nums <= 4:
-        return direct_search(target, available_numbers, operators, total_nums, top_n)
+        return direct_search_exact(target, available_numbers, operators, total_nums,
+                                   top_n if not exhaustive else 0)
+
+    splits = [(left_count, total_nums - left_count)
+              for left_count in range(1, (total_nums + 1) // 2 + 1)]
+
+    if total_nums >= PARALLEL_SPLIT_THRESHOLD:
+        # Each split is independent, so farm them out to worker processes.
+        # Workers rebuild their own (small) tables; that cost is dwarfed by
+        # the matching work at these sizes.
+        with ProcessPoolExecutor() as pool:
+            futures = [
+                pool.submit(search_split_worker, target, available_numbers,
+                            operators, left_count, right_count, max_per_value)
+                for left_count, right_count in splits
+            ]
+            for future in as_completed(futures):
+                solutions.update(future.result())
+                if early_stop and len(solutions) >= early_stop:
+                    for f in futures:
+                        f.cancel()
+                    break
+        return solutions
+
+    table = cached_subexpression_table(tuple(available_numbers), tuple(operators),
+                                       total_nums - 1, max_per_value)
+    pruned = [None] + [{v: prune_dominated(ps, best_only=not exhaustive)
+                        for v, ps in table[k].items()}
+                       for k in range(1, total_nums)]
+
+    op_mask = operator_mask(tuple(operators))
+    for left_count, right_count in splits:
+        solutions.update(search_split(
+            target, op_mask, pruned[left_count], pruned[right_count],
+            early_stop - len(solutions) if early_stop else 0,
+            symmetric=left_count == right_count))
+        if early_stop and len(solutions) >= early_stop:
+            break
 
-    for left_count in range(1, total_nums):
-        right_count = total_nums - left_count
+    return solutions
 
-        if left_count > (total_nums + 1) // 2:
-            continue
 
-        left_values = generate_all_subexpressions(available_numbers, left_count, operators, max_per_value)
-        right_values = generate_all_subexpressions(available_numbers, right_count, operators, max_per_value)
-
-        for left_val, left_partials in left_values.items():
-            # Addition
-            if '+' in operators:
-                needed = target - left_val
-                if needed in right_values:
-                    for lp in left_partials:
-                        for rp in right_values[needed]:
-                            combined_unique = tuple(sorted(set(lp.nums_used + rp.nums_used)))
-                            solutions.add(Solution(
-                                expression=f"{lp.expression} + {rp.expression}",
-                                result=target,
-                                unique_nums=combined_unique,
-                                op_count=lp.op_count + rp.op_count + 1
-                            ))
+def search_split_worker(
+        target: int,
+        available_numbers: List[int],
+        operators: List[str],
+        left_count: int,
+        right_count: int,
+        max_per_value: int
+) -> Set[Solution]:
+    """Build one split's tables and search it (runs in a worker process)."""
+    table = cached_subexpression_table(tuple(available_numbers), tuple(operators),
+                                       max(left_count, right_count), max_per_value)
+    best_only = max_per_value != 0
+    left_values = {v: prune_dominated(ps, best_only) for v, ps in table[left_count].items()}
+    right_values = {v: prune_dominated(ps, best_only) for v, ps in table[right_count].items()}
+    return search_split(target, operator_mask(tuple(operators)),
+                        left_values, right_values,
+                        symmetric=left_count == right_count)
+
+
+def search_split(
+        target: int,
+        op_mask: int,
+        left_values: Dict[int, List[PartialResult]],
+        right_values: Dict[int, List[PartialResult]],
+        early_stop: int = 0,
+        symmetric: bool = False
+) -> Set[Solution]:
+    """Find solutions pairing one left split against one right split.
+
+    This is the meet-in-the-middle hash join: both sides are value ->
+    partials maps, and each enabled operator costs one hashed probe for
+    the complementary value (target - v, target // v, ...) instead of a
+    scan. Operators arrive as an OP_BITS mask rather than strings. With
+    symmetric=True both sides are the same table (an equal split), so
+    each unordered pair is visited twice; the commutative branches then
+    keep only one ordering and the reversed -// pass is skipped entirely.
+    """
+    solutions: Set[Solution] = set()
 
-            # Subtraction
-            if '-' in operators:
-                needed = left_val - target
-                if needed in right_values:
-                    for lp in left_partials:
-                        for rp in right_values[needed]:
-                            combined_unique = tuple(sorted(set(lp.nums_used + rp.nums_used)))
-                            right_expr = wrap_for_subtraction(rp.expression)
+    # Unpack the mask and bind the dict probes once; the loops below then
+    # do a single hashed lookup per operation.
+    do_add = op_mask & BIT_ADD
+    do_sub = op_mask & BIT_SUB
+    do_mul = op_mask & BIT_MUL
+    do_div = op_mask & BIT_DIV
+    right_get = right_values.get
+    left_get = left_values.get
+
+    # Commutative operators only need one scan direction, so probe from
+    # whichever side has fewer distinct values; recipe order is free to
+    # follow the scan since a + b and b + a are the same solution.
+    if len(left_values) <= len(right_values):
+        small, small_get, big_get = left_values, left_get, right_get
+    else:
+        small, small_get, big_get = right_values, right_get, left_get
+
+    if do_add or do_mul:
+        for val, partials in small.items():
+            if early_stop and len(solutions) >= early_stop:
+                return solutions
+
+            # Addition (for an equal split, a + b is also seen as b + a
+            # when the scan reaches the other value; keep the ordering
+            # with the smaller first value)
+            if do_add and not (symmetric and val > target - val):
+                partials_hit = big_get(target - val)
+                if partials_hit:
+                    for i, lp in enumerate(partials):
+                        for rp in (partials_hit[i:]
+                                   if symmetric and val * 2 == target
+                                   else partials_hit):
+                            combined_unique = lp.nums_used | rp.nums_used
                             solutions.add(Solution(
-                                expression=f"{lp.expression} - {right_expr}",
+                                expression=render_recipe(('+', lp.recipe, rp.recipe)),
                                 result=target,
-                                unique_nums=combined_unique,
+                                unique_nums=mask_to_nums(combined_unique),
                                 op_count=lp.op_count + rp.op_count + 1
                             ))
 
-            # Multiplication
-            if '*' in operators and left_val != 0 and target % left_val == 0:
-                needed = target // left_val
-                if needed in right_values:
-                    for lp in left_partials:
-                        for rp in right_values[needed]:
-                            combined_unique = tuple(sorted(set(lp.nums_used + rp.nums_used)))
-                            left_expr = wrap_if_needed(lp.expression, for_mult_div=True)
-                            right_expr = wrap_if_needed(rp.expression, for_mult_div=True)
+            # Multiplication (same one-ordering rule as addition)
+            if (do_mul and val != 0 and target % val == 0
+                    and not (symmetric and val > target // val)):
+                partials_hit = big_get(target // val)
+                if partials_hit:
+                    for i, lp in enumerate(partials):
+                        for rp in (partials_hit[i:]
+                                   if symmetric and val * val == target
+                                   else partials_hit):
+                            combined_unique = lp.nums_used | rp.nums_used
                             solutions.add(Solution(
-                                expression=f"{left_expr} * {right_expr}",
+                                expression=render_recipe(('*', lp.recipe, rp.recipe)),
                                 result=target,
-                                unique_nums=combined_unique,
+                                unique_nums=mask_to_nums(combined_unique),
                                 op_count=lp.op_count + rp.op_count + 1
                             ))
 
-            # Division
-            if '/' in operators and target != 0 and left_val % target == 0:
-                needed = left_val // target
-                if needed in right_values and needed != 0:
-                    for lp in left_partials:
-                        for rp in right_values[needed]:
-                            combined_unique = tuple(sorted(set(lp.nums_used + rp.nums_used)))
-                            left_expr = wrap_if_needed(lp.expression, for_mult_div=True)
-                            right_expr = wrap_if_needed(rp.expression, for_mult_div=True)
-                            solutions.add(Solution(
-                                expression=f"{left_expr} / {right_expr}",
-                                result=target,
-                                unique_nums=combined_unique,
-                                op_count=lp.op_count + rp.op_count + 1
-                            ))
+    if not (do_sub or do_div):
+        return solutions
+
+    for left_val, left_partials in left_values.items():
+        if early_stop and len(solutions) >= early_stop:
+            return solutions
+
+        # Subtraction (a zero right side is never useful - the left
+        # partial alone is a shorter solution found at a lower level)
+        if do_sub and left_val != target:
+            right_partials_hit = right_get(left_val - target)
+            if right_partials_hit:
+                for lp in left_partials:
+                    for rp in right_partials_hit:
+                        combined_unique = lp.nums_used | rp.nums_used
+                        solutions.add(Solution(
+                            expression=render_recipe(('-', lp.recipe, rp.recipe)),
+                            result=target,
+                            unique_nums=mask_to_nums(combined_unique),
+                            op_count=lp.op_count + rp.op_count + 1
+                        ))
 
-        for right_val, right_partials in right_values.items():
-            needed = right_val - target
-            if '-' in operators and needed in left_values:
+        # Division
+        if do_div and target != 0 and left_val % target == 0:
+            needed = left_val // target
+            right_partials_hit = right_get(needed) if needed != 0 else None
+            if right_partials_hit:
+                for lp in left_partials:
+                    for rp in right_partials_hit:
+                        combined_unique = lp.nums_used | rp.nums_used
+                        solutions.add(Solution(
+                            expression=render_recipe(('/', lp.recipe, rp.recipe)),
+                            result=target,
+                            unique_nums=mask_to_nums(combined_unique),
+                            op_count=lp.op_count + rp.op_count + 1
+                        ))
+
+    if symmetric:
+        # Identical tables: the reversed pass below would revisit exactly
+        # the - and / pairs found above with the operands renamed.
+        return solutions
+
+    for right_val, right_partials in right_values.items():
+        if early_stop and len(solutions) >= early_stop:
+            return solutions
+
+        if do_sub and right_val != target:
+            left_partials_hit = left_get(right_val - target)
+            if left_partials_hit:
                 for rp in right_partials:
-                    for lp in left_values[needed]:
-                        combined_unique = tuple(sorted(set(lp.nums_used + rp.nums_used)))
-                        left_expr = wrap_for_subtraction(lp.expression)
+                    for lp in left_partials_hit:
+                        combined_unique = lp.nums_used | rp.nums_used
                         solutions.add(Solution(
-                            expression=f"{rp.expression} - {left_expr}",
+                            expression=render_recipe(('-', rp.recipe, lp.recipe)),
                             result=target,
-                            unique_nums=combined_unique,
+                            unique_nums=mask_to_nums(combined_unique),
                             op_count=lp.op_count + rp.op_count + 1
                         ))
 
-            if '/' in operators and target != 0 and right_val % target == 0:
-                needed = right_val // target
-                if needed in left_values and needed != 0:
-                    for rp in right_partials:
-                        for lp in left_values[needed]:
-                            combined_unique = tuple(sorted(set(lp.nums_used + rp.nums_used)))
-                            left_expr = wrap_if_needed(lp.expression, for_mult_div=True)
-                            right_expr = wrap_if_needed(rp.expression, for_mult_div=True)
-                            solutions.add(Solution(
-                                expression=f"{right_expr} / {left_expr}",
-                                result=target,
-                                unique_nums=combined_unique,
-                                op_count=lp.op_count + rp.op_count + 1
-                            ))
+        if do_div and target != 0 and right_val % target == 0:
+            needed = right_val // target
+            left_partials_hit = left_get(needed) if needed != 0 else None
+            if left_partials_hit:
+                for rp in right_partials:
+                    for lp in left_partials_hit:
+                        combined_unique = lp.nums_used | rp.nums_used
+                        solutions.add(Solution(
+                            expression=render_recipe(('/', rp.recipe, lp.recipe)),
+                            result=target,
+                            unique_nums=mask_to_nums(combined_unique),
+                            op_count=lp.op_count + rp.op_count + 1
+                        ))
+
+    return solutions
+
+
+OP_SYMBOLS = {code: sym for sym, code in OP_CODES.items()}
+
+
+def direct_search_exact(
+        target: int,
+        available_numbers: List[int],
+        operators: List[str],
+        num_count: int,
+        top_n: int,
+        roots: Optional[List[int]] = None
+) -> Set[Solution]:
+    """Direct search over expressions using exactly num_count numbers.
+
+    Expressions are built one (operator, number) pair at a time with running
+    accumulators, so a prefix whose reachable value range excludes the target
+    is abandoned before its suffixes are enumerated. A non-zero top_n stops
+    the search as soon as that many distinct solutions exist.
+
+    roots restricts the leading number; large searches use it to hand each
+    worker process one slice of the expression space.
+    """
+    solutions: Set[Solution] = set()
+    if not available_numbers:
+        return solutions
+
+    if (roots is None and num_count >= 3
+            and (len(available_numbers) ** num_count
+                 * len(operators) ** (num_count - 1)) >= DIRECT_PARALLEL_THRESHOLD):
+        # Subtrees under different leading numbers are independent, so
+        # farm one out per worker (same pattern as the split searches).
+        with ProcessPoolExecutor() as pool:
+            futures = [
+                pool.submit(direct_search_exact, target, available_numbers,
+                            operators, num_count, top_n, [n])
+                for n in available_numbers
+            ]
+            for future in as_completed(futures):
+                solutions.update(future.result())
+                if top_n and len(solutions) >= top_n:
+                    for f in futures:
+                        f.cancel()
+                    break
+        return solutions
+
+    if num_count == 1:
+        for n in available_numbers:
+            if n == target:
+                solutions.add(Solution(
+                    expression=str(n),
+                    result=n,
+                    unique_nums=(n,),
+                    op_count=0
+                ))
+                if top_n and len(solutions) >= top_n:
+                    return solutions
+        return solutions
+
+    coded_ops = [OP_CODES[o] for o in operators]
+    # Bounds are only sound without exponentiation and with positive numbers.
+    can_bound = OP_POW not in coded_ops and min(available_numbers) >= 1
+    has_sub = OP_SUB in coded_ops
+    max_abs = max(abs(n) for n in available_numbers)
+    reach = [max_abs ** r for r in range(num_count + 1)]
+
+
+    # Stack entries mirror evaluate_expression's accumulators:
+    # (nums, ops, total, add_op, chain, mul_op, last) where the current
+    # term is chain <mul_op> last and total <add_op> term is pending.
+    # mul_run marks last as a plain factor in a run of '*' (reorderable);
+    # term_len counts numbers in the current term. Both drive the
+    # commutative-ordering skips below.
+    stack = [((n,), (), 0, OP_ADD, 1, OP_MUL, n, True, 1)
+             for n in (available_numbers if roots is None else roots)]
+
+    while stack:
+        nums, ops, total, add_op, chain, mul_op, last, mul_run, term_len = stack.pop()
+        depth = len(nums)
+
+        if depth == num_count:
+            if mul_op == OP_DIV:
+                if last == 0 or chain % last != 0:
+                    continue
+                term = chain // last
+            else:
+                term = chain * last
+            value = total + term if add_op == OP_ADD else total - term
+            if value == target:
+                op_strs = [OP_SYMBOLS[c] for c in ops]
+                expr = format_expression(list(nums), op_strs)
+                unique = tuple(sorted(set(nums)))
+                solutions.add(Solution(
+                    expression=expr,
+                    result=target,
+                    unique_nums=unique,
+                    op_count=num_count - 1
+                ))
+                if top_n and len(solutions) >= top_n:
+                    return solutions
+            continue
+
+        if can_bound:
+            remaining = num_count - depth
+            pending = abs(chain) * abs(last)
+            swing = pending * reach[remaining] + remaining * reach[remaining]
+            if target > total + swing:
+                continue
+            if has_sub:
+                if target < total - swing:
+                    continue
+            elif target <= total:
+                # Without subtraction every remaining term adds at least 1.
+                continue
+
+        for op in coded_ops:
+            if op == OP_POW:
+                for n in available_numbers:
+                    stack.append((nums + (n,), ops + (op,),
+                                  total, add_op, chain, mul_op, last ** n,
+                                  False, term_len + 1))
+                continue
+
+            # Any other operator forces the pending mul/div to resolve.
+            if mul_op == OP_DIV:
+                if last == 0 or chain % last != 0:
+                    continue
+                folded = chain // last
+            else:
+                folded = chain * last
+
+            if op == OP_MUL:
+                for n in available_numbers:
+                    # x * 1 and 1 * x reduce to a shorter expression.
+                    if n == 1 or last == 1:
+                        continue
+                    # a * b == b * a: keep only the non-decreasing run.
+                    if mul_run and n < last:
+                        continue
+                    stack.append((nums + (n,), ops + (op,),
+                                  total, add_op, folded, op, n,
+                                  True, term_len + 1))
+            elif op == OP_DIV:
+                for n in available_numbers:
+                    # x / 1 reduces to x, and 1 / x only ever divides 1 / 1.
+                    if n == 1 or last == 1:
+                        continue
+                    stack.append((nums + (n,), ops + (op,),
+                                  total, add_op, folded, op, n,
+                                  False, term_len + 1))
+            else:
+                new_total = total + folded if add_op == OP_ADD else total - folded
+                for n in available_numbers:
+                    # p + n == n + p for single-number terms: keep one order.
+                    if op == OP_ADD and add_op == OP_ADD and term_len == 1 and n < last:
+                        continue
+                    # A trailing + x - x nets to zero; the expression
+                    # without it was already found two sizes earlier. Only
+                    # when the x term was added: - x - x nets to -2x.
+                    if (op == OP_SUB and add_op == OP_ADD and term_len == 1
+                            and n == last and depth + 1 == num_count):
+                        continue
+                    stack.append((nums + (n,), ops + (op,),
+                                  new_total, op, 1, OP_MUL, n,
+                                  True, 1))
 
     return solutions
 
@@ -414,33 +1144,19 @@ def direct_search(
         max_nums: int,
         top_n: int
 ) -> Set[Solution]:
-    """Direct brute-force search for small expression sizes."""
+    """Direct search over all expression sizes from 1 up to max_nums.
+
+    Sizes are enumerated smallest-first, so with a non-zero top_n the early
+    stop can never displace a better (shorter) solution.
+    """
     solutions: Set[Solution] = set()
 
     for num_count in range(1, max_nums + 1):
-        if num_count == 1:
-            for n in available_numbers:
-                if n == target:
-                    solutions.add(Solution(
-                        expression=str(n),
-                        result=n,
-                        unique_nums=(n,),
-                        op_count=0
-                    ))
-            continue
-
-        for nums in product(available_numbers, repeat=num_count):
-            for ops in product(operators, repeat=num_count - 1):
-                result = evaluate_expression(list(nums), list(ops))
-                if result == target:
-                    expr = format_expression(list(nums), list(ops))
-                    unique = tuple(sorted(set(nums)))
-                    solutions.add(Solution(
-                        expression=expr,
-                        result=target,
-                        unique_nums=unique,
-                        op_count=num_count - 1
-                    ))
+        solutions.update(direct_search_exact(
+            target, available_numbers, operators, num_count,
+            top_n - len(solutions) if top_n else 0))
+        if top_n and len(solutions) >= top_n:
+            break
 
     return solutions
 
@@ -459,20 +1175,16 @@ def find_solutions(
         progress_callback=None
 ) -> List[Solution]:
     """Find combinations of integers that equal the target."""
-    if exclude is None:
-        exclude = []
+    exclude_set = frozenset(exclude) if exclude else frozenset()
+    available_numbers = [n for n in range(1, max_int + 1) if n not in exclude_set]
 
-    available_numbers = [n for n in range(1, max_int + 1) if n not in exclude]
-
-    operators = ['+']
-    if allow_multiply:
-        operators.append('*')
-    if allow_subtract:
-        operators.append('-')
-    if allow_divide:
-        operators.append('/')
-    if allow_exponentiate:
-        operators.append('**')
+    # Frozen once here; every downstream search shares the same tuple, and
+    # cached_subexpression_table can use it as a cache key without copying.
+    operators = ('+',) \
+        + (('*',) if allow_multiply else ()) \
+        + (('-',) if allow_subtract else ()) \
+        + (('/',) if allow_divide else ()) \
+        + (('**',) if allow_exponentiate else ())
 
     all_solutions: Set[Solution] = set()
 
@@ -481,14 +1193,19 @@ def find_solutions(
             progress_callback(f"Searching {num_count} numbers...")
 
         if num_count <= 4:
-            new_solutions = direct_search(target, available_numbers, operators, num_count, top_n)
-            new_solutions = {s for s in new_solutions if
-                             s.op_count == num_count - 1 or (num_count == 1 and s.op_count == 0)}
+            new_solutions = direct_search_exact(target, available_numbers, operators, num_count,
+                                                0 if exhaustive else top_n)
         else:
             new_solutions = meet_in_middle_search(target, available_numbers, operators, num_count, top_n, exhaustive)
 
         all_solutions.update(new_solutions)
 
+        # Levels never repeat an op count, so a solution pruned here can
+        # never be produced again; keeping only the running top_n bounds
+        # the accumulator no matter how many candidates a level emits.
+        if len(all_solutions) > top_n:
+            all_solutions = set(heapq.nsmallest(top_n, all_solutions))
+
         # Early termination
         if all_solutions:
             best_op_count = min(s.op_count for s in all_solutions)
@@ -500,5 +1217,4 @@ def find_solutions(
                     if best_op_count < next_level_ops - 1:
                         break
 
-    sorted_solutions = sorted(all_solutions)
-    return sorted_solutions[:top_n]
+    return sorted(all_solutions)
@@ -5,50 +5,107 @@ Find expressions using integers and operators to reach a target number.
 """
 
 import streamlit as st
+import os
 import time
 import re
 import urllib.parse
 from pathlib import Path
-import streamlit.components.v1 as components
 
 # ============== Core Logic (from number_combinations.py) ==============
 
 from number_combinations import *
 
+# Compiled once at import; both run over whole documents.
+LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+MERMAID_RE = re.compile(r'```mermaid\n(.*?)\n```', re.DOTALL)
+
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def cached_find_solutions(target, max_int, allow_multiply, allow_subtract,
+                          allow_divide, exclude, max_numbers, top_n,
+                          exhaustive, _progress_callback=None):
+    """find_solutions behind st.cache_data.
+
+    Streamlit reruns the whole script per interaction; caching on the
+    search parameters makes repeated searches instant. exclude must be a
+    tuple so the arguments hash; the underscore keeps the (unhashable)
+    progress callback out of the cache key.
+    """
+    return find_solutions(
+        target=target,
+        max_int=max_int,
+        allow_multiply=allow_multiply,
+        allow_subtract=allow_subtract,
+        allow_divide=allow_divide,
+        exclude=list(exclude),
+        max_numbers=max_numbers,
+        top_n=top_n,
+        exhaustive=exhaustive,
+        progress_callback=_progress_callback
+    )
+
 # ============== Render Functions ==============
 
+@st.fragment
+def render_results(solutions, elapsed):
+    """Render found solutions; a fragment so later unrelated interactions
+    elsewhere on the page don't re-execute this block."""
+    st.success(f"Found {len(solutions)} solution(s) in {elapsed:.2f}s")
+
+    for i, sol in enumerate(solutions, 1):
+        unique_str = ", ".join(str(n) for n in sol.unique_nums)
+
+        with st.container():
+            st.markdown(f"""
+            **{i}.** `{sol.expression}` = **{sol.result}**
+
+            <small>Unique integers: {unique_str} ({len(sol.unique_nums)}) • Operations: {sol.op_count}</small>
+            """, unsafe_allow_html=True)
+            st.divider()
+
 def render_solver():
     st.markdown("Find expressions using integers and operators to reach a target number.")
 
-    # Input section
-    col1, col2 = st.columns(2)
-
-    with col1:
-        target = st.number_input("Target Number", value=100, min_value=1, step=1)
-        max_int = st.number_input("Maximum Integer", value=9, min_value=1, max_value=20, step=1)
-
-    with col2:
-        max_numbers = st.slider("Max Numbers in Expression", min_value=2, max_value=10, value=6)
-        top_n = st.slider("Number of Solutions", min_value=1, max_value=20, value=5)
-
-    # Operators
-    st.subheader("Operators")
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        use_add = st.checkbox("Addition (+)", value=True, disabled=True)
-    with col2:
-        use_multiply = st.checkbox("Multiplication (×)", value=True)
-    with col3:
-        use_subtract = st.checkbox("Subtraction (−)", value=True)
-    with col4:
-        use_divide = st.checkbox("Division (÷)", value=False)
-
-    # Exclude numbers
-    exclude_input = st.text_input(
-        "Exclude Numbers (comma-separated)", 
-        placeholder="e.g., 10, 11, 12",
-        help="Numbers to exclude from available integers"
-    )
+    # All inputs live in one form: configuring them triggers no reruns,
+    # only the submit button does.
+    with st.form("search_form"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            target = st.number_input("Target Number", value=100, min_value=1, step=1)
+            max_int = st.number_input("Maximum Integer", value=9, min_value=1, max_value=20, step=1)
+
+        with col2:
+            max_numbers = st.slider("Max Numbers in Expression", min_value=2, max_value=10, value=6)
+            top_n = st.slider("Number of Solutions", min_value=1, max_value=20, value=5)
+
+        # Operators
+        st.subheader("Operators")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            use_add = st.checkbox("Addition (+)", value=True, disabled=True)
+        with col2:
+            use_multiply = st.checkbox("Multiplication (×)", value=True)
+        with col3:
+            use_subtract = st.checkbox("Subtraction (−)", value=True)
+        with col4:
+            use_divide = st.checkbox("Division (÷)", value=False)
+
+        # Exclude numbers
+        exclude_input = st.text_input(
+            "Exclude Numbers (comma-separated)",
+            placeholder="e.g., 10, 11, 12",
+            help="Numbers to exclude from available integers"
+        )
+
+        # Mode
+        exhaustive = st.checkbox(
+            "Exhaustive Search",
+            value=False,
+            help="Guaranteed optimal results but slower. Use for important searches."
+        )
+
+        submitted = st.form_submit_button("🔍 Find Solutions", type="primary", use_container_width=True)
 
     exclude = []
     if exclude_input.strip():
@@ -57,17 +114,10 @@ def render_solver():
         except ValueError:
             st.error("Invalid exclude list. Please enter comma-separated numbers.")
 
-    # Mode
-    exhaustive = st.checkbox(
-        "Exhaustive Search", 
-        value=False,
-        help="Guaranteed optimal results but slower. Use for important searches."
-    )
-
-    # Search button
-    if st.button("🔍 Find Solutions", type="primary", use_container_width=True):
+    if submitted:
         # Build description
-        available = [n for n in range(1, max_int + 1) if n not in exclude]
+        exclude_set = frozenset(exclude)
+        available = [n for n in range(1, max_int + 1) if n not in exclude_set]
         
         if not available:
             st.error("No numbers available after exclusions!")
@@ -90,37 +140,33 @@ def render_solver():
             start_time = time.time()
             
             with st.spinner("Searching..."):
-                solutions = find_solutions(
+                solutions = cached_find_solutions(
                     target=target,
                     max_int=max_int,
                     allow_multiply=use_multiply,
                     allow_subtract=use_subtract,
                     allow_divide=use_divide,
-                    exclude=exclude,
+                    exclude=tuple(sorted(exclude)),
                     max_numbers=max_numbers,
                     top_n=top_n,
                     exhaustive=exhaustive,
-                    progress_callback=update_progress
+                    _progress_callback=update_progress
                 )
             
             elapsed = time.time() - start_time
             progress_placeholder.empty()
-            
-            if not solutions:
-                st.warning(f"No solutions found. (searched in {elapsed:.2f}s)")
-            else:
-                st.success(f"Found {len(solutions)} solution(s) in {elapsed:.2f}s")
-                
-                for i, sol in enumerate(solutions, 1):
-                    unique_str = ", ".join(str(n) for n in sol.unique_nums)
-                    
-                    with st.container():
-                        st.markdown(f"""
-                        **{i}.** `{sol.expression}` = **{sol.result}**
-                        
-                        <small>Unique integers: {unique_str} ({len(sol.unique_nums)}) • Operations: {sol.op_count}</small>
-                        """, unsafe_allow_html=True)
-                        st.divider()
+
+            # Persist so the results survive reruns from other widgets.
+            st.session_state["solutions"] = solutions
+            st.session_state["search_elapsed"] = elapsed
+
+    if "solutions" in st.session_state:
+        solutions = st.session_state["solutions"]
+        elapsed = st.session_state["search_elapsed"]
+        if not solutions:
+            st.warning(f"No solutions found. (searched in {elapsed:.2f}s)")
+        else:
+            render_results(solutions, elapsed)
 
     # Footer
     st.markdown("---")
@@ -131,7 +177,19 @@ def render_solver():
     )
 
 def render_mermaid(code: str, height: int = 600):
-    """Render mermaid code using an HTML component."""
+    """Render mermaid code using an HTML component.
+
+    The module import below looks like it could be hoisted into one
+    shared loader, but every components.html call is its own sandboxed
+    iframe: a script loaded in one cannot see another's DOM, so each
+    block must carry the import. The browser fetches the CDN module once
+    and serves the rest from its HTTP cache; the per-block cost is only
+    module-graph resolution.
+    """
+    # Imported here so solver-only sessions never pay the component
+    # loader cost; module imports are cached after the first call.
+    import streamlit.components.v1 as components
+
     # Escape single quotes and backslashes for the template
     escaped_code = code.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
     
@@ -156,40 +214,114 @@ def render_mermaid(code: str, height: int = 600):
         scrolling=False
     )
 
-def render_docs():
-    st.markdown("### 📚 Project Documentation")
-    
-    # scan for docs
+def _iter_md(root: str):
+    """Yield paths of .md files under root, recursively.
+
+    os.scandir hands back DirEntry objects with cached type info, so the
+    walk filters on the name string without a stat call or Path object
+    per directory entry; only matches are materialised further.
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_md(entry.path)
+            elif entry.name.endswith(".md"):
+                yield entry.path
+
+
+@st.cache_resource
+def scan_docs():
+    """Scan the docs tree once per session.
+
+    The file list, display names and link-resolution mapping never change
+    between reruns, so every navigation click reuses the same dicts
+    instead of re-walking the directory. Returns None if docs/ is absent.
+    """
     docs_dir = Path("docs")
     if not docs_dir.exists():
-        st.error("Documentation directory not found!")
-        return
+        return None
 
-    # Gather all markdown files
-    files = sorted(list(docs_dir.rglob("*.md")))
-    
-    if not files:
-        st.warning("No documentation files found.")
-        return
-
-    # Create mappings for display logic
     file_map = {}
     path_to_key = {}
-    
-    for f in files:
+
+    for path in sorted(_iter_md(str(docs_dir))):
+        f = Path(path)
         # Create cleaner names
         name = str(f.relative_to(docs_dir)).replace("\\", "/").replace(".md", "")
         if name == "README":
             name = "Documentation Index"
-            
+
         # Title case
         name = " / ".join(part.replace("-", " ").title() for part in name.split("/"))
         file_map[name] = f
-        
+
         # Store absolute resolved path logic for linking
         # Use simple string matching for now to avoid complexity
         path_to_key[str(f.resolve()).lower()] = name
 
+    return file_map, path_to_key
+
+@st.cache_data(show_spinner=False)
+def load_doc(path_str: str, mtime: float) -> str:
+    """Read one doc and rewrite its markdown links, cached per file.
+
+    The mtime argument is only there to key the cache: an edited file
+    gets re-read, an untouched one costs a dict lookup instead of disk
+    I/O and regex work on every rerun.
+    """
+    file_path = Path(path_str)
+    _, path_to_key = scan_docs()
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    # A substring check is a fast C-level scan; most docs without links
+    # skip the regex pass entirely.
+    if '](' not in content:
+        return content
+
+    # --- Link Pre-processing ---
+    # Replace [Text](path/to/file.md) with <a href="?doc=Key">Text</a>
+
+    def replace_link(match):
+        text = match.group(1)
+        link = match.group(2)
+
+        # Ignore external links or non-md
+        if link.startswith("http") or not link.endswith(".md"):
+            return match.group(0)
+
+        # Resolve relative path
+        # Base is current file_path parent
+        try:
+            target_path = (file_path.parent / link).resolve()
+            target_key = path_to_key.get(str(target_path).lower())
+
+            if target_key:
+                # Encode for URL
+                encoded_key = urllib.parse.quote(target_key)
+                return f'<a href="?doc={encoded_key}" target="_self">{text}</a>'
+        except Exception:
+            pass
+
+        return match.group(0)
+
+    # Pattern: [Label](Link)
+    return LINK_RE.sub(replace_link, content)
+
+def render_docs():
+    st.markdown("### 📚 Project Documentation")
+
+    scanned = scan_docs()
+    if scanned is None:
+        st.error("Documentation directory not found!")
+        return
+
+    file_map, path_to_key = scanned
+    if not file_map:
+        st.warning("No documentation files found.")
+        return
+
     # Determine default selection from Query Params
     qp = st.query_params
     default_index = 0
@@ -210,54 +342,23 @@ def render_docs():
     if selected_name:
         file_path = file_map[selected_name]
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            processed_content = load_doc(str(file_path), os.path.getmtime(file_path))
 
-            # --- Link Pre-processing ---
-            # Replace [Text](path/to/file.md) with <a href="?doc=Key">Text</a>
-            
-            def replace_link(match):
-                text = match.group(1)
-                link = match.group(2)
-                
-                # Ignore external links or non-md
-                if link.startswith("http") or not link.endswith(".md"):
-                    return match.group(0)
-                
-                # Resolve relative path
-                # Base is current file_path parent
-                try:
-                    target_path = (file_path.parent / link).resolve()
-                    target_key = path_to_key.get(str(target_path).lower())
-                    
-                    if target_key:
-                        # Encode for URL
-                        encoded_key = urllib.parse.quote(target_key)
-                        return f'<a href="?doc={encoded_key}" target="_self">{text}</a>'
-                except Exception:
-                    pass
-                
-                return match.group(0)
-
-            # Apply regex
-            # Pattern: [Label](Link)
-            processed_content = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', replace_link, content)
-            
             st.markdown("---")
             
             # --- Mermaid Rendering ---
-            # Split by mermaid blocks
-            parts = re.split(r'(```mermaid\n.*?\n```)', processed_content, flags=re.DOTALL)
-            
-            for part in parts:
-                if part.startswith("```mermaid"):
-                    # Extract code
-                    match = re.search(r'```mermaid\n(.*?)\n```', part, re.DOTALL)
-                    if match:
-                        mermaid_code = match.group(1)
-                        # Find a reasonable title for the expander
-                        with st.expander("📊 View Algorithm Flowchart", expanded=True):
-                            render_mermaid(mermaid_code, height=800)
+            # Split by mermaid blocks; the capture group makes split()
+            # alternate plain text (even indices) with the fenced code
+            # (odd indices), so no second extraction pass is needed.
+            if '```mermaid' in processed_content:
+                parts = MERMAID_RE.split(processed_content)
+            else:
+                parts = [processed_content]
+
+            for i, part in enumerate(parts):
+                if i % 2:
+                    with st.expander("📊 View Algorithm Flowchart", expanded=True):
+                        render_mermaid(part, height=800)
                 elif part.strip():
                     st.markdown(part, unsafe_allow_html=True)
             
@@ -267,29 +368,42 @@ def render_docs():
 
 # ============== Main App Entry ==============
 
-st.set_page_config(
-    page_title="Number Combinations Solver",
-    page_icon="🔢",
-    layout="centered"
-)
+def main():
+    # The page config sticks for the whole browser session, so only the
+    # first rerun needs to send it; session_state resets on a real reload,
+    # which re-triggers the call.
+    if not st.session_state.get("_page_configured"):
+        st.set_page_config(
+            page_title="Number Combinations Solver",
+            page_icon="🔢",
+            layout="centered"
+        )
+        st.session_state["_page_configured"] = True
 
-st.title("🔢 Number Combinations Solver")
+    st.title("🔢 Number Combinations Solver")
 
-# Tab Navigation
-# Check for deep link to determine tab order/active tab
-start_on_docs = "doc" in st.query_params
+    # Tab Navigation
+    # Check for deep link to determine tab order/active tab
+    start_on_docs = "doc" in st.query_params
 
-if start_on_docs:
-    tab_docs, tab_solver = st.tabs(["📚 Documentation", "🔍 Solver"])
-    
-    with tab_docs:
-        render_docs()
-    with tab_solver:
-        render_solver()
-else:
-    tab_solver, tab_docs = st.tabs(["🔍 Solver", "📚 Documentation"])
-    
-    with tab_solver:
-        render_solver()
-    with tab_docs:
-        render_docs()
+    if start_on_docs:
+        tab_docs, tab_solver = st.tabs(["📚 Documentation", "🔍 Solver"])
+
+        with tab_docs:
+            render_docs()
+        with tab_solver:
+            render_solver()
+    else:
+        tab_solver, tab_docs = st.tabs(["🔍 Solver", "📚 Documentation"])
+
+        with tab_solver:
+            render_solver()
+        with tab_docs:
+            render_docs()
+
+
+# streamlit run executes this file with __name__ == "__main__", so the
+# guard still renders the app while letting tests import find_solutions
+# and friends without touching any UI code.
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,61 @@
+import ast
+import operator
 import unittest
-from unittest.mock import MagicMock
+from functools import lru_cache
 import sys
 import os
 
-# Mock streamlit
-sys.modules['streamlit'] = MagicMock()
-import streamlit as st
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Configure the mock to handle st.columns unpacking
-def columns_mock(spec):
-    if isinstance(spec, int):
-        return [MagicMock() for _ in range(spec)]
-    return [MagicMock() for _ in spec]
+from number_combinations import find_solutions
 
-st.columns.side_effect = columns_mock
+@lru_cache(maxsize=None)
+def _fs(target, max_int, allow_multiply=False, allow_subtract=False,
+        allow_divide=False, exclude_t=(), max_numbers=6, top_n=5,
+        exhaustive=False):
+    """Memoized find_solutions for the tests.
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    Identical parameter sets share one search run instead of repeating
+    it per assertion; exclude is a tuple so the arguments hash.
+    """
+    return tuple(find_solutions(
+        target=target, max_int=max_int, allow_multiply=allow_multiply,
+        allow_subtract=allow_subtract, allow_divide=allow_divide,
+        exclude=list(exclude_t), max_numbers=max_numbers, top_n=top_n,
+        exhaustive=exhaustive))
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Pow: operator.pow,
+}
 
-from streamlit_app import find_solutions
+@lru_cache(maxsize=None)
+def _safe_int_eval(expr):
+    """Evaluate a solver expression string with integer arithmetic.
+
+    A small ast walk instead of eval(): no parser/compiler round trip per
+    assert, and '/' gets the solver's exact-division semantics (raises on
+    remainder or zero divisor instead of producing a float).
+    """
+    def walk(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -walk(node.operand)
+        if isinstance(node, ast.BinOp):
+            left = walk(node.left)
+            right = walk(node.right)
+            if isinstance(node.op, ast.Div):
+                if right == 0 or left % right != 0:
+                    raise ValueError(f"Inexact division in {expr!r}")
+                return left // right
+            return _BIN_OPS[type(node.op)](left, right)
+        raise ValueError(f"Unsupported syntax in {expr!r}")
+
+    return walk(ast.parse(expr, mode='eval').body)
 
 class TestSolverRegression(unittest.TestCase):
     
@@ -28,7 +65,7 @@ class TestSolverRegression(unittest.TestCase):
         Target: 373, Max Int: 8, Max Numbers: 6
         Subtraction DISABLED.
         """
-        solutions = find_solutions(
+        solutions = _fs(
             target=373,
             max_int=8,
             allow_multiply=True,
@@ -46,16 +83,39 @@ class TestSolverRegression(unittest.TestCase):
         # 2. Verify all solutions are mathematically correct
         for sol in solutions:
             try:
-                # Use eval to check mathematical correctness
-                # Replace '/' with '//' for integer division check if needed, 
-                # but the solver uses integer division semantics for '/' anyway in its evaluation
-                # logic, but in string expression it prints '/'.
+                # The solver uses integer division semantics for '/' in its
+                # evaluation logic but prints '/'; _safe_int_eval mirrors that.
                 # For this specific test case, division is disabled, so we expect only * and +
-                val = eval(sol.expression)
+                val = _safe_int_eval(sol.expression)
                 self.assertEqual(val, 373, f"Expression {sol.expression} evaluated to {val}, expected 373")
             except Exception as e:
                 self.fail(f"Failed to evaluate expression {sol.expression}: {e}")
 
+    def test_repeated_subtraction_of_same_number(self):
+        """
+        Regression Test: a - x - x must not be pruned as a no-op.
+        Target: 9, Available: 5, 19. 19 - 5 - 5 = 9 is the only
+        3-number solution, and its trailing pair is '- 5 - 5' (nets -10),
+        not the redundant '+ 5 - 5' the search is allowed to skip.
+        """
+        solutions = _fs(
+            target=9,
+            max_int=19,
+            allow_multiply=False,
+            allow_subtract=True,
+            allow_divide=False,
+            exclude_t=tuple(n for n in range(1, 20) if n not in (5, 19)),
+            max_numbers=3,
+            top_n=5,
+            exhaustive=True
+        )
+
+        self.assertTrue(any(s.result == 9 for s in solutions),
+                        "19 - 5 - 5 was not found")
+        for sol in solutions:
+            self.assertEqual(_safe_int_eval(sol.expression), 9,
+                             f"Expression {sol.expression} does not evaluate to 9")
+
     def test_parentheses_precedence_in_subtraction(self):
         """
         Test that (A - (B + C)) is correctly formatted.
@@ -64,13 +124,13 @@ class TestSolverRegression(unittest.TestCase):
         Available: 20, 5, 5
         20 - (5 + 5) = 10
         """
-        solutions = find_solutions(
+        solutions = _fs(
             target=10,
             max_int=20, # Allow 20
             allow_multiply=False,
             allow_subtract=True,
             allow_divide=False,
-            exclude=[1, 2, 3, 4, 6, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 18, 19], # Force usage of 20, 5, 5 if possible
+            exclude_t=(1, 2, 3, 4, 6, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 18, 19), # Force usage of 20, 5, 5 if possible
             max_numbers=3,
             top_n=20,
             exhaustive=True # Force exhaustive to ensure we find it
@@ -80,7 +140,7 @@ class TestSolverRegression(unittest.TestCase):
         for sol in solutions:
             if sol.result == 10:
                 # Check for correct evaluation
-                val = eval(sol.expression)
+                val = _safe_int_eval(sol.expression)
                 self.assertEqual(val, 10, f"Expression {sol.expression} evaluated to {val}, expected 10")
                 
                 # Check if we have the specific structure we're looking for (subtraction of a sum)
@@ -1,6 +1,7 @@
 import unittest
 import sys
 import os
+from functools import lru_cache
 
 # Add parent directory to path to import number_combinations
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,6 +16,21 @@ from number_combinations import (
     Solution
 )
 
+@lru_cache(maxsize=None)
+def _fs(target, max_int, allow_multiply=False, allow_subtract=False,
+        allow_divide=False, exclude_t=(), max_numbers=6, top_n=5,
+        exhaustive=False):
+    """Memoized find_solutions for the tests.
+
+    Identical parameter sets share one search run instead of repeating
+    it per assertion; exclude is a tuple so the arguments hash.
+    """
+    return tuple(find_solutions(
+        target=target, max_int=max_int, allow_multiply=allow_multiply,
+        allow_subtract=allow_subtract, allow_divide=allow_divide,
+        exclude=list(exclude_t), max_numbers=max_numbers, top_n=top_n,
+        exhaustive=exhaustive))
+
 class TestEvaluation(unittest.TestCase):
     def test_basic_arithmetic(self):
         self.assertEqual(evaluate_expression([10, 5], ['+']), 15)
@@ -84,14 +100,14 @@ class TestHelpers(unittest.TestCase):
 class TestFindSolutions(unittest.TestCase):
     def test_target_reached(self):
         # Simple target 10 from [5, 5]
-        sols = find_solutions(10, 5, allow_multiply=False, allow_subtract=True, exclude=[1,2,3,4], max_numbers=2)
+        sols = _fs(10, 5, allow_multiply=False, allow_subtract=True, exclude_t=(1,2,3,4), max_numbers=2)
         found = any(s.result == 10 for s in sols)
         self.assertTrue(found)
 
     def test_exclude_respected(self):
         # Target 5, Max 5, but Exclude 5. 
         # Must reach 5 using other numbers (e.g. 2+3, 4+1)
-        sols = find_solutions(5, 5, allow_multiply=True, exclude=[5], max_numbers=2)
+        sols = _fs(5, 5, allow_multiply=True, exclude_t=(5,), max_numbers=2)
         for sol in sols:
             self.assertNotIn(5, sol.unique_nums)
 
@@ -101,24 +117,24 @@ class TestFindSolutions(unittest.TestCase):
         # If multiply disabled: must use 2+4 or 1+5 etc.
         
         # Disable multiply
-        sols = find_solutions(6, 6, allow_multiply=False, allow_subtract=False, max_numbers=2)
+        sols = _fs(6, 6, allow_multiply=False, allow_subtract=False, max_numbers=2)
         for sol in sols:
             self.assertNotIn('*', sol.expression)
             
         # Disable subtract
-        sols = find_solutions(1, 5, allow_multiply=False, allow_subtract=False, max_numbers=2)
+        sols = _fs(1, 5, allow_multiply=False, allow_subtract=False, max_numbers=2)
         # Cannot make 1 from integers [1..5] with 2 numbers using only + (min is 1+2=3) unless we use 1 itself but this searches for expressions.
         # Actually simplest is just number 1 if num_count=1 allowed.
         # Let's check logic: if subtract is OFF, we shouldn't see '-'
         
         # Force a case where subtraction is the natural answer but disabled
         # Target 2 using [5, 3]. 5-3=2. If subtract off, impossible.
-        sols = find_solutions(2, 5, allow_multiply=False, allow_subtract=False, exclude=[1,2,4], max_numbers=2)
+        sols = _fs(2, 5, allow_multiply=False, allow_subtract=False, exclude_t=(1,2,4), max_numbers=2)
         # Only available: 3, 5. 3+3=6, 3+5=8. No way to get 2.
         self.assertEqual(len(sols), 0)
         
         # Enable subtract
-        sols = find_solutions(2, 5, allow_multiply=False, allow_subtract=True, exclude=[1,2,4], max_numbers=2)
+        sols = _fs(2, 5, allow_multiply=False, allow_subtract=True, exclude_t=(1,2,4), max_numbers=2)
         # Should match 5-3
         found = any("5 - 3" in s.expression or "3 - 5" in s.expression for s in sols) # 3-5 is -2
         # Actually exact match logic might vary, but result==2 is key
@@ -126,7 +142,7 @@ class TestFindSolutions(unittest.TestCase):
 
     def test_max_numbers(self):
         # Max numbers 2. Should not find 1+1+1
-        sols = find_solutions(3, 5, allow_multiply=False, max_numbers=2)
+        sols = _fs(3, 5, allow_multiply=False, max_numbers=2)
         for sol in sols:
             # count numbers in expression roughly
             # or just rely on op_count. 2 numbers = 1 op.